@@ -2,13 +2,14 @@ import datetime
 import json
 import logging
 import sys
+from contextlib import ExitStack
 
 import click
 from tabulate import tabulate
 
 from ausfin.sources import TwentyEightDegreesSource, UbankSource, SuncorpBankSource, IngBankSource, \
     CommbankBankSource, CommbankSharesSource, RatesetterSource, AcornsSource, driver, SuncorpSuperSource, \
-    BtcMarketsSource, UniSuperSource
+    BtcMarketsSource, UniSuperSource, reset_driver
 
 
 @click.group()
@@ -44,21 +45,32 @@ def balance(source, username, password):
 @cli.command(name='net-worth')
 @click.option('--config-filename', '-c', default='config.json')
 @click.option('--out-filename', '-o')
-def net_worth(config_filename, out_filename):
+@click.option('--shared-driver/--no-shared-driver', default=False,
+              help='Reuse one browser for all accounts, clearing its state between each')
+def net_worth(config_filename, out_filename, shared_driver):
     with open(config_filename, 'r') as f:
         config = json.load(f)
     accounts = config['accounts']
 
     balance_data = []
-    for account in accounts:
-        print(f'Loading data from {account["source"]}')
-        # For now don't use shared drivers as can cause sources which share sites
-        # to fail as they're already logged in previously. Need to fix by adding login detection
-        with driver(implicit_wait_secs=10) as d:
-            source = sources.get(account['source'])(driver=d)
-            balance = source.fetch_balance(account['username'], account['password'])
-
-        balance_data.append([account['source'], balance])
+    with ExitStack() as stack:
+        shared = stack.enter_context(driver(implicit_wait_secs=10)) if shared_driver else None
+        previous_source = None
+
+        for account in accounts:
+            print(f'Loading data from {account["source"]}')
+            if shared is not None:
+                # Sources which share sites would otherwise find themselves already logged in
+                if previous_source is not None:
+                    reset_driver(shared, previous_source.visited_origins)
+                previous_source = sources.get(account['source'])(driver=shared)
+                balance = previous_source.fetch_balance(account['username'], account['password'])
+            else:
+                with driver(implicit_wait_secs=10) as d:
+                    source = sources.get(account['source'])(driver=d)
+                    balance = source.fetch_balance(account['username'], account['password'])
+
+            balance_data.append([account['source'], balance])
 
     print(tabulate(balance_data, headers=['Source', 'Balance'], floatfmt='.2f'))
 
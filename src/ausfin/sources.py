@@ -10,6 +10,7 @@ import time
 
 import requests
 from selenium import webdriver
+from selenium.webdriver.common.by import By
 
 
 @contextmanager
@@ -21,6 +22,9 @@ def driver(implicit_wait_secs):
 
     d = webdriver.Chrome(chrome_options=options)
     d.implicitly_wait(time_to_wait=implicit_wait_secs)
+    # Selenium 3.11 has no wrapper for chromedriver's devtools endpoint, so register it ourselves
+    d.command_executor._commands['send_command_and_get_result'] = (
+        'POST', '/session/$sessionId/chromium/send_command_and_get_result')
 
     try:
         yield d
@@ -28,23 +32,84 @@ def driver(implicit_wait_secs):
         d.quit()
 
 
+def reset_driver(d: webdriver.Chrome, origins=()):
+    # Wipe cookies, cache and site storage so a reused driver starts the next source logged out.
+    # Storage is cleared per origin, so we clear every origin the source recorded, the final page and any
+    # host which set a cookie. An origin which is only passed through and sets no cookies can't be seen.
+    origins = {origin for origin in origins if origin is not None}
+    final_origin = _origin(d.current_url)
+    if final_origin is not None:
+        origins.add(final_origin)
+
+    cookies = _send_devtools_command(d, 'Network.getAllCookies')['cookies']
+    origins.update(f'https://{cookie["domain"].lstrip(".")}' for cookie in cookies)
+
+    for origin in sorted(origins):
+        _send_devtools_command(d, 'Storage.clearDataForOrigin', origin=origin, storageTypes='all')
+    _send_devtools_command(d, 'Network.clearBrowserCookies')
+    _send_devtools_command(d, 'Network.clearBrowserCache')
+
+    remaining = _send_devtools_command(d, 'Network.getAllCookies')['cookies']
+    if remaining:
+        domains = ', '.join(sorted({cookie['domain'] for cookie in remaining}))
+        raise RuntimeError(f'Failed to clear cookies for {domains}, refusing to reuse driver')
+
+    # sessionStorage belongs to the tab rather than the origin, so swap to a fresh window
+    old_window = d.current_window_handle
+    d.execute_script('window.open("about:blank");')
+    new_window = next(handle for handle in d.window_handles if handle != old_window)
+    d.switch_to.window(old_window)
+    d.close()
+    d.switch_to.window(new_window)
+
+
+def _origin(url):
+    scheme, _, rest = url.partition('://')
+    if scheme not in ('http', 'https'):
+        return None
+    return f'{scheme}://{rest.split("/", 1)[0]}'
+
+
+def _send_devtools_command(d: webdriver.Chrome, cmd, **params):
+    # Void commands return an empty dict, anything else returns the devtools result object
+    response = d.execute('send_command_and_get_result', {'cmd': cmd, 'params': params})
+    if not response or not isinstance(response.get('value'), dict):
+        raise RuntimeError(f'Devtools command {cmd} failed: {response}')
+    return response['value']
+
+
 class Source:
+    # Element which is only present on the login page, used to detect an existing session
+    login_locator = None
+
     def __init__(self, driver: webdriver.Chrome):
         self.driver = driver
         self.logger = logging.getLogger(__name__)
+        self.visited_origins = set()
 
     def fetch_balance(self, username, password, base_url=None):
         pass
 
+    def _open_login_page(self, base_url):
+        self.driver.get(base_url)
+        # base_url may redirect to a separate login host, so keep both
+        self.visited_origins.add(_origin(base_url))
+        self.visited_origins.add(_origin(self.driver.current_url))
+
+        if self.login_locator is not None and not self.driver.find_elements(*self.login_locator):
+            raise RuntimeError(f'Already logged in at {base_url}, login field {self.login_locator[1]} not found')
+
     def _balance_to_num(self, balance):
         return float(balance[1:].replace(',', '').replace(' ', ''))
 
 
 class TwentyEightDegreesSource(Source):
+    login_locator = (By.ID, 'AccessToken_Username')
+
     def fetch_balance(self, username, password, base_url='https://28degrees-online.latitudefinancial.com.au/'):
-        self.driver.get(base_url)
+        self._open_login_page(base_url)
 
-        username_field = self.driver.find_element_by_id('AccessToken_Username')
+        username_field = self.driver.find_element(*self.login_locator)
         password_field = self.driver.find_element_by_id('AccessToken_Password')
         login_btn = self.driver.find_element_by_id('login-submit')
 
@@ -59,10 +124,12 @@ class TwentyEightDegreesSource(Source):
 
 
 class UbankSource(Source):
+    login_locator = (By.ID, 'username')
+
     def fetch_balance(self, username, password, base_url='https://www.ubank.com.au/NAGAuthn/ubank.secgate.action'):
-        self.driver.get(base_url)
+        self._open_login_page(base_url)
 
-        username_field = self.driver.find_element_by_id('username')
+        username_field = self.driver.find_element(*self.login_locator)
         password_field = self.driver.find_element_by_id('password')
         login_btn = self.driver.find_element_by_name('Login')
 
@@ -77,10 +144,12 @@ class UbankSource(Source):
 
 
 class SuncorpBankSource(Source):
+    login_locator = (By.ID, 'UserId')
+
     def fetch_balance(self, username, password, base_url='https://internetbanking.suncorpbank.com.au/'):
-        self.driver.get(base_url)
+        self._open_login_page(base_url)
 
-        username_field = self.driver.find_element_by_id('UserId')
+        username_field = self.driver.find_element(*self.login_locator)
         password_field = self.driver.find_element_by_id('password')
         login_btn = self.driver.find_element_by_id('login-button')
 
@@ -100,10 +169,12 @@ class SuncorpBankSource(Source):
 
 
 class SuncorpSuperSource(Source):
+    login_locator = (By.ID, 'UserId')
+
     def fetch_balance(self, username, password, base_url='https://internetbanking.suncorpbank.com.au/'):
-        self.driver.get(base_url)
+        self._open_login_page(base_url)
 
-        username_field = self.driver.find_element_by_id('UserId')
+        username_field = self.driver.find_element(*self.login_locator)
         password_field = self.driver.find_element_by_id('password')
         login_btn = self.driver.find_element_by_id('login-button')
 
@@ -134,6 +205,8 @@ class KeypadButton:
 
 
 class IngBankSource(Source):
+    login_locator = (By.ID, 'cifField')
+
     # PNG data fields from one set of page loads of the keypad
     num_pad_btns = {
         '0': 'iVBORw0KGgoAAAANSUhEUgAAALQAAABuCAYAAACOaDl7AAAAAXNSR0IArs4c6QAAAARnQU1BAACxjwv8YQUAAAAJcEhZcwAADsMAAA7DA'
@@ -286,9 +359,9 @@ class IngBankSource(Source):
     }
 
     def fetch_balance(self, username, password, base_url='https://www.ing.com.au/securebanking/'):
-        self.driver.get(base_url)
+        self._open_login_page(base_url)
 
-        client_number_field = self.driver.find_element_by_id('cifField')
+        client_number_field = self.driver.find_element(*self.login_locator)
         login_btn = self.driver.find_element_by_id('login-btn')
 
         client_number_field.send_keys(username)
@@ -345,10 +418,12 @@ class IngBankSource(Source):
 
 
 class CommbankBankSource(Source):
+    login_locator = (By.ID, 'txtMyClientNumber_field')
+
     def fetch_balance(self, username, password, base_url='https://www.my.commbank.com.au/netbank/Logon/Logon.aspx'):
-        self.driver.get(base_url)
+        self._open_login_page(base_url)
 
-        username_field = self.driver.find_element_by_id('txtMyClientNumber_field')
+        username_field = self.driver.find_element(*self.login_locator)
         password_field = self.driver.find_element_by_id('txtMyPassword_field')
         login_btn = self.driver.find_element_by_id('btnLogon_field')
 
@@ -386,10 +461,12 @@ class CommbankBankSource(Source):
 
 
 class CommbankSharesSource(Source):
+    login_locator = (By.ID, 'txtMyClientNumber_field')
+
     def fetch_balance(self, username, password, base_url='https://www.my.commbank.com.au/netbank/Logon/Logon.aspx'):
-        self.driver.get(base_url)
+        self._open_login_page(base_url)
 
-        username_field = self.driver.find_element_by_id('txtMyClientNumber_field')
+        username_field = self.driver.find_element(*self.login_locator)
         password_field = self.driver.find_element_by_id('txtMyPassword_field')
         login_btn = self.driver.find_element_by_id('btnLogon_field')
 
@@ -426,10 +503,12 @@ class CommbankSharesSource(Source):
 
 
 class RatesetterSource(Source):
+    login_locator = (By.ID, 'ctl00_cphContentArea_cphForm_txtEmail')
+
     def fetch_balance(self, username, password, base_url='https://members.ratesetter.com.au/login.aspx'):
-        self.driver.get(base_url)
+        self._open_login_page(base_url)
 
-        username_field = self.driver.find_element_by_id('ctl00_cphContentArea_cphForm_txtEmail')
+        username_field = self.driver.find_element(*self.login_locator)
         password_field = self.driver.find_element_by_id('ctl00_cphContentArea_cphForm_txtPassword')
         login_btn = self.driver.find_element_by_id('ctl00_cphContentArea_cphForm_btnLogin')
 
@@ -443,12 +522,14 @@ class RatesetterSource(Source):
 
 
 class AcornsSource(Source):
+    login_locator = (By.CLASS_NAME, 'spec-login-email-input')
+
     def fetch_balance(self, username, password, base_url='https://app.raizinvest.com.au/auth/login'):
-        self.driver.get(base_url)
+        self._open_login_page(base_url)
 
         self.logger.debug(self.driver.page_source)
 
-        username_field = self.driver.find_element_by_class_name('spec-login-email-input')
+        username_field = self.driver.find_element(*self.login_locator)
         password_field = self.driver.find_element_by_class_name('spec-login-password-input')
         login_btn = self.driver.find_element_by_class_name('spec-login-button')
 
@@ -514,10 +595,12 @@ class BtcMarketsSource(Source):
 
 
 class UniSuperSource(Source):
+    login_locator = (By.ID, 'username')
+
     def fetch_balance(self, username, password, base_url='https://memberonline.unisuper.com.au/'):
-        self.driver.get(base_url)
+        self._open_login_page(base_url)
 
-        username_field = self.driver.find_element_by_id('username')
+        username_field = self.driver.find_element(*self.login_locator)
         password_field = self.driver.find_element_by_id('password')
         login_btn = self.driver.find_element_by_xpath('//*[@id="loginForm"]/div[2]/input')
 
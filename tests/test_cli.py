@@ -0,0 +1,46 @@
+import json
+from contextlib import contextmanager
+from unittest import mock
+
+from click.testing import CliRunner
+
+from ausfin import cli
+
+
+class FakeSource:
+    def __init__(self, driver):
+        self.driver = driver
+        self.visited_origins = {f'https://{id(self)}.example.com'}
+
+    def fetch_balance(self, username, password):
+        return float(password)
+
+
+def test_net_worth_shared_driver_resets_between_accounts(tmpdir):
+    config_filename = tmpdir.join('config.json')
+    config_filename.write(json.dumps({'accounts': [
+        {'source': 'fake', 'username': 'a', 'password': '1.5'},
+        {'source': 'fake', 'username': 'b', 'password': '2.5'},
+        {'source': 'fake', 'username': 'c', 'password': '3'},
+    ]}))
+    out_filename = tmpdir.join('out.json')
+
+    shared = object()
+    created = []
+
+    @contextmanager
+    def fake_driver(implicit_wait_secs):
+        created.append(shared)
+        yield shared
+
+    with mock.patch.dict(cli.sources, {'fake': FakeSource}), \
+            mock.patch.object(cli, 'driver', fake_driver), \
+            mock.patch.object(cli, 'reset_driver') as reset_driver:
+        result = CliRunner().invoke(cli.net_worth, [
+            '-c', str(config_filename), '-o', str(out_filename), '--shared-driver'])
+
+    assert result.exit_code == 0, result.output
+    assert created == [shared]
+    assert reset_driver.call_count == 2
+    assert all(call[0][0] is shared for call in reset_driver.call_args_list)
+    assert [b['balance'] for b in json.loads(out_filename.read())['balances']] == [1.5, 2.5, 3.0]
@@ -0,0 +1,115 @@
+import pytest
+
+from ausfin.sources import SuncorpBankSource, _origin, reset_driver
+
+
+class FakeDriver:
+    def __init__(self, current_url='https://example.com/app', cookies=(), login_elements=('field',),
+                 sticky_cookies=False):
+        self.current_url = current_url
+        self.cookies = list(cookies)
+        self.sticky_cookies = sticky_cookies
+        self.login_elements = list(login_elements)
+        self.window_handles = ['old']
+        self.current_window_handle = 'old'
+        self.commands = []
+        self.calls = []
+        self.switch_to = self
+
+    def execute(self, command, params):
+        # Mirrors chromedriver, where only send_command_and_get_result returns the devtools result
+        self.commands.append((params['cmd'], params['params']))
+        if command == 'send_command':
+            return {'value': None}
+        assert command == 'send_command_and_get_result'
+
+        if params['cmd'] == 'Network.getAllCookies':
+            return {'value': {'cookies': list(self.cookies)}}
+        if params['cmd'] == 'Network.clearBrowserCookies' and not self.sticky_cookies:
+            self.cookies = []
+        return {'value': {}}
+
+    def execute_script(self, script):
+        self.calls.append(('execute_script', script))
+        self.window_handles.append('new')
+
+    def window(self, handle):
+        self.calls.append(('switch', handle))
+        self.current_window_handle = handle
+
+    def close(self):
+        self.calls.append(('close', self.current_window_handle))
+        self.window_handles.remove(self.current_window_handle)
+
+    def get(self, url):
+        self.calls.append(('get', url))
+        self.current_url = url
+
+    def find_elements(self, by, value):
+        self.calls.append(('find_elements', by, value))
+        return self.login_elements
+
+
+@pytest.mark.parametrize('url,expected', [
+    ('https://example.com', 'https://example.com'),
+    ('https://example.com/some/path?q=1', 'https://example.com'),
+    ('http://example.com:8080/path', 'http://example.com:8080'),
+    ('data:,', None),
+    ('about:blank', None),
+])
+def test_origin(url, expected):
+    assert _origin(url) == expected
+
+
+def test_reset_driver_clears_visited_origins_and_swaps_window():
+    d = FakeDriver(current_url='https://app.example.com/home', cookies=[{'domain': '.auth.example.com'}])
+
+    reset_driver(d, {'https://login.example.com', None})
+
+    assert d.commands == [
+        ('Network.getAllCookies', {}),
+        ('Storage.clearDataForOrigin', {'origin': 'https://app.example.com', 'storageTypes': 'all'}),
+        ('Storage.clearDataForOrigin', {'origin': 'https://auth.example.com', 'storageTypes': 'all'}),
+        ('Storage.clearDataForOrigin', {'origin': 'https://login.example.com', 'storageTypes': 'all'}),
+        ('Network.clearBrowserCookies', {}),
+        ('Network.clearBrowserCache', {}),
+        ('Network.getAllCookies', {}),
+    ]
+    assert ('close', 'old') in d.calls
+    assert d.window_handles == ['new']
+    assert d.current_window_handle == 'new'
+
+
+def test_reset_driver_fails_when_cookies_remain():
+    d = FakeDriver(cookies=[{'domain': '.example.com'}], sticky_cookies=True)
+
+    with pytest.raises(RuntimeError, match='example.com'):
+        reset_driver(d)
+
+
+def test_send_devtools_command_rejects_result_less_endpoint():
+    d = FakeDriver()
+    execute = d.execute
+    d.execute = lambda command, params: execute('send_command', params)
+
+    with pytest.raises(RuntimeError, match='Network.getAllCookies'):
+        reset_driver(d)
+
+
+def test_open_login_page_records_origin():
+    d = FakeDriver()
+    source = SuncorpBankSource(driver=d)
+
+    d.get = lambda url: setattr(d, 'current_url', 'https://login.suncorpbank.com.au/auth')
+    source._open_login_page('https://internetbanking.suncorpbank.com.au/')
+
+    assert ('find_elements', 'id', 'UserId') in d.calls
+    assert source.visited_origins == {'https://internetbanking.suncorpbank.com.au', 'https://login.suncorpbank.com.au'}
+
+
+def test_open_login_page_fails_when_already_logged_in():
+    d = FakeDriver(login_elements=())
+    source = SuncorpBankSource(driver=d)
+
+    with pytest.raises(RuntimeError, match='Already logged in'):
+        source._open_login_page('https://internetbanking.suncorpbank.com.au/')